@@ -32,22 +32,35 @@ to convert their formats to Kiro API format.
 
 import json
 from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import islice
 from typing import Any, Dict, List, Optional, Tuple
 
 from loguru import logger
 
+# orjson is optional - falls back to the standard json module
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 from kiro.config import (
     TOOL_DESCRIPTION_MAX_LENGTH,
     FAKE_REASONING_ENABLED,
     FAKE_REASONING_MAX_TOKENS,
 )
 
+# Fixed values of the Kiro API payload
+_KIRO_ORIGIN = "AI_EDITOR"
+_KIRO_CHAT_TRIGGER_TYPE = "MANUAL"
+_KIRO_TOOL_RESULT_STATUS = "success"
+
 
 # ==================================================================================================
 # Data Classes for Unified Message Format
 # ==================================================================================================
 
-@dataclass
+@dataclass(slots=True)
 class UnifiedMessage:
     """
     Unified message format used internally by converters.
@@ -55,6 +68,9 @@ class UnifiedMessage:
     This format is API-agnostic and can be created from both OpenAI and Anthropic formats.
     Serves as the canonical representation for all message data before conversion to Kiro API.
     
+    Built only from data already validated by the API models, so it is a plain
+    slotted dataclass without any validation on construction or assignment.
+    
     Attributes:
         role: Message role (user, assistant, system)
         content: Text content or list of content blocks
@@ -70,7 +86,7 @@ class UnifiedMessage:
     images: Optional[List[Dict[str, Any]]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class UnifiedTool:
     """
     Unified tool format used internally by converters.
@@ -102,6 +118,29 @@ class KiroPayloadResult:
 # Text Content Extraction
 # ==================================================================================================
 
+def _extract_item_text(item: Any) -> str:
+    """
+    Extracts text from a single content block.
+    
+    Args:
+        item: Content block (dict or plain string)
+    
+    Returns:
+        Text of the block, or empty string for non-text blocks
+    """
+    if isinstance(item, dict):
+        item_type = item.get("type")
+        if item_type == "text":
+            return item.get("text", "")
+        # Skip image blocks - they're handled separately
+        if item_type == "image" or item_type == "image_url":
+            return ""
+        return item.get("text", "")
+    if isinstance(item, str):
+        return item
+    return ""
+
+
 def extract_text_content(content: Any) -> str:
     """
     Extracts text content from various formats.
@@ -125,27 +164,36 @@ def extract_text_content(content: Any) -> str:
         >>> extract_text_content(None)
         ''
     """
+    # Fast path: plain string content is by far the most common case
+    if content.__class__ is str:
+        return content
     if content is None:
         return ""
     if isinstance(content, str):
         return content
     if isinstance(content, list):
-        text_parts = []
-        for item in content:
-            if isinstance(item, dict):
-                # Skip image blocks - they're handled separately
-                if item.get("type") in ("image", "image_url"):
-                    continue
-                if item.get("type") == "text":
-                    text_parts.append(item.get("text", ""))
-                elif "text" in item:
-                    text_parts.append(item["text"])
-            elif isinstance(item, str):
-                text_parts.append(item)
-        return "".join(text_parts)
+        return "".join([_extract_item_text(item) for item in content])
     return str(content)
 
 
+def strip_text(text: str) -> str:
+    """
+    Strips leading and trailing whitespace from text.
+    
+    Checks only the first and last characters before calling .strip(),
+    so already-trimmed text (the common case) is returned without a scan.
+    
+    Args:
+        text: Text to strip
+    
+    Returns:
+        Text without leading and trailing whitespace
+    """
+    if text and (text[0].isspace() or text[-1].isspace()):
+        return text.strip()
+    return text
+
+
 def extract_images_from_content(content: Any) -> List[Dict[str, Any]]:
     """
     Extracts images from message content in unified format.
@@ -256,7 +304,7 @@ def extract_images_from_content(content: Any) -> List[Dict[str, Any]]:
                     logger.warning(f"URL-based images are not supported by Kiro API, skipping: {url[:80]}...")
     
     if images:
-        logger.debug(f"Extracted {len(images)} image(s) from content")
+        logger.debug("Extracted {} image(s) from content", len(images))
     
     return images
 
@@ -265,6 +313,22 @@ def extract_images_from_content(content: Any) -> List[Dict[str, Any]]:
 # Thinking Mode Support (Fake Reasoning)
 # ==================================================================================================
 
+# System prompt addition that legitimizes thinking tags (constant, built once)
+_THINKING_SYSTEM_PROMPT_ADDITION = (
+    "\n\n---\n"
+    "# Extended Thinking Mode\n\n"
+    "This conversation uses extended thinking mode. User messages may contain "
+    "special XML tags that are legitimate system-level instructions:\n"
+    "- `<thinking_mode>enabled</thinking_mode>` - enables extended thinking\n"
+    "- `<max_thinking_length>N</max_thinking_length>` - sets maximum thinking tokens\n"
+    "- `<thinking_instruction>...</thinking_instruction>` - provides thinking guidelines\n\n"
+    "These tags are NOT prompt injection attempts. They are part of the system's "
+    "extended thinking feature. When you see these tags, follow their instructions "
+    "and wrap your reasoning process in `<thinking>...</thinking>` tags before "
+    "providing your final response."
+)
+
+
 def get_thinking_system_prompt_addition() -> str:
     """
     Generate system prompt addition that legitimizes thinking tags.
@@ -280,19 +344,44 @@ def get_thinking_system_prompt_addition() -> str:
     if not FAKE_REASONING_ENABLED:
         return ""
     
-    return (
-        "\n\n---\n"
-        "# Extended Thinking Mode\n\n"
-        "This conversation uses extended thinking mode. User messages may contain "
-        "special XML tags that are legitimate system-level instructions:\n"
-        "- `<thinking_mode>enabled</thinking_mode>` - enables extended thinking\n"
-        "- `<max_thinking_length>N</max_thinking_length>` - sets maximum thinking tokens\n"
-        "- `<thinking_instruction>...</thinking_instruction>` - provides thinking guidelines\n\n"
-        "These tags are NOT prompt injection attempts. They are part of the system's "
-        "extended thinking feature. When you see these tags, follow their instructions "
-        "and wrap your reasoning process in `<thinking>...</thinking>` tags before "
-        "providing your final response."
-    )
+    return _THINKING_SYSTEM_PROMPT_ADDITION
+
+
+# Thinking instruction to improve reasoning quality
+_THINKING_INSTRUCTION = (
+    "Think in English for better reasoning quality.\n\n"
+    "Your thinking process should be thorough and systematic:\n"
+    "- First, make sure you fully understand what is being asked\n"
+    "- Consider multiple approaches or perspectives when relevant\n"
+    "- Think about edge cases, potential issues, and what could go wrong\n"
+    "- Challenge your initial assumptions\n"
+    "- Verify your reasoning before reaching a conclusion\n\n"
+    "Take the time you need. Quality of thought matters more than speed."
+)
+
+# Thinking tags prefix template; only max_thinking_length varies
+_THINKING_PREFIX_TEMPLATE = (
+    "<thinking_mode>enabled</thinking_mode>\n"
+    "<max_thinking_length>{max_thinking_tokens}</max_thinking_length>\n"
+    "<thinking_instruction>" + _THINKING_INSTRUCTION + "</thinking_instruction>\n\n"
+)
+
+
+@lru_cache(maxsize=None)
+def _build_thinking_prefix(max_thinking_tokens: int) -> str:
+    """
+    Build the thinking tags prefix for the given max thinking tokens.
+    
+    The prefix only depends on FAKE_REASONING_MAX_TOKENS, so it is built
+    once per distinct value and reused for every request.
+    
+    Args:
+        max_thinking_tokens: Value for the <max_thinking_length> tag
+    
+    Returns:
+        Thinking tags prefix to prepend to user content
+    """
+    return _THINKING_PREFIX_TEMPLATE.format(max_thinking_tokens=max_thinking_tokens)
 
 
 def inject_thinking_tags(content: str) -> str:
@@ -312,42 +401,113 @@ def inject_thinking_tags(content: str) -> str:
     if not FAKE_REASONING_ENABLED:
         return content
     
-    # Thinking instruction to improve reasoning quality
-    thinking_instruction = (
-        "Think in English for better reasoning quality.\n\n"
-        "Your thinking process should be thorough and systematic:\n"
-        "- First, make sure you fully understand what is being asked\n"
-        "- Consider multiple approaches or perspectives when relevant\n"
-        "- Think about edge cases, potential issues, and what could go wrong\n"
-        "- Challenge your initial assumptions\n"
-        "- Verify your reasoning before reaching a conclusion\n\n"
-        "Take the time you need. Quality of thought matters more than speed."
-    )
+    return _build_thinking_prefix(FAKE_REASONING_MAX_TOKENS) + content
+
+
+# ==================================================================================================
+# JSON Helpers
+# ==================================================================================================
+
+# Smallest magnitude at which orjson may have parsed an integer as a float
+_ORJSON_INT_LIMIT = 2.0 ** 63
+
+
+def _has_large_float(obj: Any) -> bool:
+    """
+    Checks whether parsed JSON holds a float outside the 64-bit integer range.
     
-    thinking_prefix = (
-        f"<thinking_mode>enabled</thinking_mode>\n"
-        f"<max_thinking_length>{FAKE_REASONING_MAX_TOKENS}</max_thinking_length>\n"
-        f"<thinking_instruction>{thinking_instruction}</thinking_instruction>\n\n"
-    )
+    orjson parses integers beyond 64 bits as floats, so such values may have
+    lost precision. Walks the parsed values rather than scanning the raw text:
+    string values are skipped without looking inside them, so the walk costs
+    a fraction of the parse even for large file contents in tool arguments.
     
-    logger.debug(f"Injecting fake reasoning tags with max_tokens={FAKE_REASONING_MAX_TOKENS}")
+    Args:
+        obj: Object parsed by orjson
     
-    return thinking_prefix + content
+    Returns:
+        True if any float is at least 2**63 in magnitude
+    """
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, float) and abs(value) >= _ORJSON_INT_LIMIT:
+            return True
+    return False
+
+
+def _json_loads(data: str) -> Any:
+    """
+    Parses JSON string, using orjson when available.
+    
+    orjson is stricter than the json module: it rejects NaN/Infinity and
+    lone surrogates, and parses integers beyond 64 bits as floats. Such
+    input is parsed with the json module instead, so results match it.
+    
+    Args:
+        data: JSON string
+    
+    Returns:
+        Parsed object
+    
+    Raises:
+        ValueError: If data is not valid JSON
+    """
+    if orjson is not None:
+        try:
+            result = orjson.loads(data)
+        except ValueError:
+            return json.loads(data)
+        if not _has_large_float(result):
+            return result
+    return json.loads(data)
 
 
 # ==================================================================================================
 # JSON Schema Sanitization
 # ==================================================================================================
 
-def sanitize_json_schema(schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+def _schema_needs_sanitization(schema: Dict[str, Any]) -> bool:
     """
-    Sanitizes JSON Schema from fields that Kiro API doesn't accept.
+    Checks whether JSON Schema contains fields that Kiro API doesn't accept.
     
-    Kiro API returns 400 "Improperly formed request" error if:
-    - required is an empty array []
-    - additionalProperties is present in schema
+    Walks the schema the same way as sanitize_json_schema and stops at the
+    first problematic field.
     
-    This function recursively processes the schema and removes problematic fields.
+    Args:
+        schema: JSON Schema to check
+    
+    Returns:
+        True if sanitize_json_schema would remove anything from the schema
+    """
+    for key, value in schema.items():
+        if key == "additionalProperties":
+            return True
+        
+        if key == "required" and isinstance(value, list) and len(value) == 0:
+            return True
+        
+        if key == "properties" and isinstance(value, dict):
+            for prop_value in value.values():
+                if isinstance(prop_value, dict) and _schema_needs_sanitization(prop_value):
+                    return True
+        elif isinstance(value, dict):
+            if _schema_needs_sanitization(value):
+                return True
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict) and _schema_needs_sanitization(item):
+                    return True
+    
+    return False
+
+
+def _sanitize_json_schema_copy(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Builds a sanitized copy of JSON Schema (see sanitize_json_schema).
     
     Args:
         schema: JSON Schema to sanitize
@@ -355,10 +515,7 @@ def sanitize_json_schema(schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     Returns:
         Sanitized copy of schema
     """
-    if not schema:
-        return {}
-    
-    result = {}
+    result: Dict[str, Any] = {}
     
     for key, value in schema.items():
         # Skip empty required arrays
@@ -372,15 +529,15 @@ def sanitize_json_schema(schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         # Recursively process nested objects
         if key == "properties" and isinstance(value, dict):
             result[key] = {
-                prop_name: sanitize_json_schema(prop_value) if isinstance(prop_value, dict) else prop_value
+                prop_name: _sanitize_json_schema_copy(prop_value) if isinstance(prop_value, dict) else prop_value
                 for prop_name, prop_value in value.items()
             }
         elif isinstance(value, dict):
-            result[key] = sanitize_json_schema(value)
+            result[key] = _sanitize_json_schema_copy(value)
         elif isinstance(value, list):
             # Process lists (e.g., anyOf, oneOf)
             result[key] = [
-                sanitize_json_schema(item) if isinstance(item, dict) else item
+                _sanitize_json_schema_copy(item) if isinstance(item, dict) else item
                 for item in value
             ]
         else:
@@ -389,6 +546,80 @@ def sanitize_json_schema(schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     return result
 
 
+def sanitize_json_schema(schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Sanitizes JSON Schema from fields that Kiro API doesn't accept.
+    
+    Kiro API returns 400 "Improperly formed request" error if:
+    - required is an empty array []
+    - additionalProperties is present in schema
+    
+    This function recursively processes the schema and removes problematic fields.
+    Most schemas contain neither, so the schema is checked first and returned
+    as-is when there is nothing to remove (the result must not be mutated).
+    
+    Args:
+        schema: JSON Schema to sanitize
+    
+    Returns:
+        Sanitized copy of schema, or the original schema if it is already clean
+    """
+    if not schema:
+        return {}
+    
+    if not _schema_needs_sanitization(schema):
+        return schema
+    
+    return _sanitize_json_schema_copy(schema)
+
+
+# Sanitized tool schemas keyed by their JSON serialization.
+# Clients (coding agents in particular) send the same tool set with every
+# request, so sanitized schemas are reused across requests; once full, the
+# least recently used schema is evicted.
+# Cached dicts are shared between callers and must not be mutated.
+_SANITIZED_SCHEMA_CACHE: Dict[str, Dict[str, Any]] = {}
+_SANITIZED_SCHEMA_CACHE_MAX_SIZE = 512
+
+
+def _sanitize_tool_input_schema(schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Sanitizes tool input schema, reusing results for schemas seen before.
+    
+    Args:
+        schema: JSON Schema of tool parameters
+    
+    Returns:
+        Sanitized schema (the original schema if it is already clean)
+    """
+    if not schema:
+        return {}
+    
+    if not _schema_needs_sanitization(schema):
+        return schema
+    
+    try:
+        # Key order is kept in the cache key, so schemas differing only in
+        # property order are cached separately and keep the client's order.
+        # The json module is used rather than orjson: orjson writes NaN,
+        # Infinity and None all as null, so distinct schemas would share a key.
+        schema_json = json.dumps(schema)
+    except (TypeError, ValueError):
+        # Not JSON-serializable as is - sanitize without caching
+        return _sanitize_json_schema_copy(schema)
+    
+    sanitized = _SANITIZED_SCHEMA_CACHE.pop(schema_json, None)
+    if sanitized is None:
+        sanitized = _sanitize_json_schema_copy(schema)
+        if len(_SANITIZED_SCHEMA_CACHE) >= _SANITIZED_SCHEMA_CACHE_MAX_SIZE:
+            # Evict the least recently used entry (first in insertion order)
+            del _SANITIZED_SCHEMA_CACHE[next(iter(_SANITIZED_SCHEMA_CACHE))]
+    # (Re)insert at the end, so the dict stays ordered by last use
+    _SANITIZED_SCHEMA_CACHE[schema_json] = sanitized
+    
+    return sanitized
+
+
 # ==================================================================================================
 # Tool Processing
 # ==================================================================================================
@@ -418,6 +649,13 @@ def process_tools_with_long_descriptions(
     if TOOL_DESCRIPTION_MAX_LENGTH <= 0:
         return tools, ""
     
+    # Fast path: all descriptions are short (the common case) - return tools unchanged
+    if not any(
+        tool.description and len(tool.description) > TOOL_DESCRIPTION_MAX_LENGTH
+        for tool in tools
+    ):
+        return tools, ""
+    
     tool_documentation_parts = []
     processed_tools = []
     
@@ -429,9 +667,10 @@ def process_tools_with_long_descriptions(
             processed_tools.append(tool)
         else:
             # Description is too long - move to system prompt
+            # Per-tool log: arguments are formatted by loguru only if DEBUG is enabled
             logger.debug(
-                f"Tool '{tool.name}' has long description ({len(description)} chars > {TOOL_DESCRIPTION_MAX_LENGTH}), "
-                f"moving to system prompt"
+                "Tool '{}' has long description ({} chars > {}), moving to system prompt",
+                tool.name, len(description), TOOL_DESCRIPTION_MAX_LENGTH
             )
             
             # Create documentation for system prompt
@@ -476,13 +715,13 @@ def convert_tools_to_kiro_format(tools: Optional[List[UnifiedTool]]) -> List[Dic
     kiro_tools = []
     for tool in tools:
         # Sanitize parameters from fields that Kiro API doesn't accept
-        sanitized_params = sanitize_json_schema(tool.input_schema)
+        sanitized_params = _sanitize_tool_input_schema(tool.input_schema)
         
         # Kiro API requires non-empty description
         description = tool.description
-        if not description or not description.strip():
+        if not description or not strip_text(description):
             description = f"Tool: {tool.name}"
-            logger.debug(f"Tool '{tool.name}' has empty description, using placeholder")
+            logger.debug("Tool '{}' has empty description, using placeholder", tool.name)
         
         kiro_tools.append({
             "toolSpecification": {
@@ -545,7 +784,7 @@ def convert_images_to_kiro_format(images: Optional[List[Dict[str, Any]]]) -> Lis
                 if extracted_media_type:
                     media_type = extracted_media_type
                 data = actual_data
-                logger.debug(f"Stripped data URL prefix, extracted media_type: {media_type}")
+                logger.debug("Stripped data URL prefix, extracted media_type: {}", media_type)
             except (ValueError, IndexError) as e:
                 logger.warning(f"Failed to parse data URL prefix: {e}")
         
@@ -560,7 +799,7 @@ def convert_images_to_kiro_format(images: Optional[List[Dict[str, Any]]]) -> Lis
         })
     
     if kiro_images:
-        logger.debug(f"Converted {len(kiro_images)} image(s) to Kiro format")
+        logger.debug("Converted {} image(s) to Kiro format", len(kiro_images))
     
     return kiro_images
 
@@ -596,7 +835,7 @@ def convert_tool_results_to_kiro_format(tool_results: List[Dict[str, Any]]) -> L
         
         kiro_results.append({
             "content": [{"text": content_text}],
-            "status": "success",
+            "status": _KIRO_TOOL_RESULT_STATUS,
             "toolUseId": tr.get("tool_use_id", "")
         })
     
@@ -616,18 +855,18 @@ def extract_tool_results_from_content(content: Any) -> List[Dict[str, Any]]:
     Returns:
         List of tool results in Kiro format
     """
-    tool_results = []
-    
-    if isinstance(content, list):
-        for item in content:
-            if isinstance(item, dict) and item.get("type") == "tool_result":
-                tool_results.append({
-                    "content": [{"text": extract_text_content(item.get("content", "")) or "(empty result)"}],
-                    "status": "success",
-                    "toolUseId": item.get("tool_use_id", "")
-                })
+    if not isinstance(content, list):
+        return []
     
-    return tool_results
+    return [
+        {
+            "content": [{"text": extract_text_content(item.get("content", "")) or "(empty result)"}],
+            "status": _KIRO_TOOL_RESULT_STATUS,
+            "toolUseId": item.get("tool_use_id", "")
+        }
+        for item in content
+        if isinstance(item, dict) and item.get("type") == "tool_result"
+    ]
 
 
 def extract_tool_uses_from_message(
@@ -654,11 +893,17 @@ def extract_tool_uses_from_message(
     if tool_calls:
         for tc in tool_calls:
             if isinstance(tc, dict):
-                func = tc.get("function", {})
+                func = tc.get("function") or {}
                 arguments = func.get("arguments", "{}")
                 # Handle both string (OpenAI) and dict (Anthropic unified) formats
                 if isinstance(arguments, str):
-                    input_data = json.loads(arguments) if arguments else {}
+                    try:
+                        input_data = _json_loads(arguments) if arguments else {}
+                    except ValueError:
+                        logger.warning(
+                            f"Failed to parse arguments of tool call '{tc.get('id', '')}', using empty input"
+                        )
+                        input_data = {}
                 else:
                     input_data = arguments if arguments else {}
                 tool_uses.append({
@@ -669,13 +914,15 @@ def extract_tool_uses_from_message(
     
     # From content blocks (Anthropic format)
     if isinstance(content, list):
-        for item in content:
-            if isinstance(item, dict) and item.get("type") == "tool_use":
-                tool_uses.append({
-                    "name": item.get("name", ""),
-                    "input": item.get("input", {}),
-                    "toolUseId": item.get("id", "")
-                })
+        tool_uses.extend(
+            {
+                "name": item.get("name", ""),
+                "input": item.get("input", {}),
+                "toolUseId": item.get("id", "")
+            }
+            for item in content
+            if isinstance(item, dict) and item.get("type") == "tool_use"
+        )
     
     return tool_uses
 
@@ -769,6 +1016,67 @@ def tool_results_to_text(tool_results: List[Dict[str, Any]]) -> str:
 # Message Merging
 # ==================================================================================================
 
+def _tool_content_to_text(msg: UnifiedMessage) -> UnifiedMessage:
+    """
+    Converts tool content of a single message to text representation.
+    
+    Args:
+        msg: Message in unified format
+    
+    Returns:
+        The message itself if it has no tool content, otherwise a copy
+        with tool_calls and tool_results converted to text
+    """
+    if not msg.tool_calls and not msg.tool_results:
+        return msg
+    
+    # Start with existing text content
+    existing_content = extract_text_content(msg.content)
+    content_parts = []
+    
+    if existing_content:
+        content_parts.append(existing_content)
+    
+    # Convert tool_calls to text (for assistant messages)
+    if msg.tool_calls:
+        tool_text = tool_calls_to_text(msg.tool_calls)
+        if tool_text:
+            content_parts.append(tool_text)
+    
+    # Convert tool_results to text (for user messages)
+    if msg.tool_results:
+        result_text = tool_results_to_text(msg.tool_results)
+        if result_text:
+            content_parts.append(result_text)
+    
+    # Join all parts with double newline
+    content = "\n\n".join(content_parts) if content_parts else "(empty)"
+    
+    # Create a copy of the message without tool content but with text representation
+    return UnifiedMessage(
+        role=msg.role,
+        content=content,
+        tool_calls=None,
+        tool_results=None
+    )
+
+
+def _log_stripped_tool_content(total_tool_calls: int, total_tool_results: int) -> None:
+    """
+    Logs summary of tool content converted to text.
+    
+    Args:
+        total_tool_calls: Number of converted tool_calls
+        total_tool_results: Number of converted tool_results
+    """
+    # DEBUG level - this is normal for clients like Cline/Roo
+    if total_tool_calls > 0 or total_tool_results > 0:
+        logger.debug(
+            f"Converted tool content to text (no tools defined): "
+            f"{total_tool_calls} tool_calls, {total_tool_results} tool_results"
+        )
+
+
 def strip_all_tool_content(messages: List[UnifiedMessage]) -> Tuple[List[UnifiedMessage], bool]:
     """
     Strips ALL tool-related content from messages, converting it to text representation.
@@ -796,59 +1104,55 @@ def strip_all_tool_content(messages: List[UnifiedMessage]) -> Tuple[List[Unified
     total_tool_results_stripped = 0
     
     for msg in messages:
-        # Check if this message has any tool content
-        has_tool_calls = bool(msg.tool_calls)
-        has_tool_results = bool(msg.tool_results)
-        
-        if has_tool_calls or has_tool_results:
-            if has_tool_calls:
-                total_tool_calls_stripped += len(msg.tool_calls)
-            if has_tool_results:
-                total_tool_results_stripped += len(msg.tool_results)
-            
-            # Start with existing text content
-            existing_content = extract_text_content(msg.content)
-            content_parts = []
-            
-            if existing_content:
-                content_parts.append(existing_content)
-            
-            # Convert tool_calls to text (for assistant messages)
-            if has_tool_calls:
-                tool_text = tool_calls_to_text(msg.tool_calls)
-                if tool_text:
-                    content_parts.append(tool_text)
-            
-            # Convert tool_results to text (for user messages)
-            if has_tool_results:
-                result_text = tool_results_to_text(msg.tool_results)
-                if result_text:
-                    content_parts.append(result_text)
-            
-            # Join all parts with double newline
-            content = "\n\n".join(content_parts) if content_parts else "(empty)"
-            
-            # Create a copy of the message without tool content but with text representation
-            cleaned_msg = UnifiedMessage(
-                role=msg.role,
-                content=content,
-                tool_calls=None,
-                tool_results=None
-            )
-            result.append(cleaned_msg)
-        else:
-            result.append(msg)
+        if msg.tool_calls:
+            total_tool_calls_stripped += len(msg.tool_calls)
+        if msg.tool_results:
+            total_tool_results_stripped += len(msg.tool_results)
+        result.append(_tool_content_to_text(msg))
+    
+    _log_stripped_tool_content(total_tool_calls_stripped, total_tool_results_stripped)
     
     had_tool_content = total_tool_calls_stripped > 0 or total_tool_results_stripped > 0
+    return result, had_tool_content
+
+
+def _strip_orphaned_tool_results(
+    msg: UnifiedMessage,
+    previous: Optional[UnifiedMessage]
+) -> Optional[UnifiedMessage]:
+    """
+    Strips tool_results from a message without a preceding assistant with tool_calls.
     
-    # Log summary once (DEBUG level - this is normal for clients like Cline/Roo)
-    if had_tool_content:
-        logger.debug(
-            f"Converted tool content to text (no tools defined): "
-            f"{total_tool_calls_stripped} tool_calls, {total_tool_results_stripped} tool_results"
-        )
+    Args:
+        msg: Message in unified format
+        previous: Previous message (before merging), or None for the first message
     
-    return result, had_tool_content
+    Returns:
+        Copy of the message without tool_results if they were orphaned, None otherwise
+    """
+    if not msg.tool_results:
+        return None
+    
+    # Check if the previous message is an assistant with tool_calls
+    if previous is not None and previous.role == "assistant" and previous.tool_calls:
+        return None
+    
+    # We cannot create a valid synthetic assistant message because we don't know
+    # the original tool name and arguments. Kiro API validates tool names.
+    # Strip the tool_results to avoid "Improperly formed request" error.
+    logger.warning(
+        f"Stripping {len(msg.tool_results)} orphaned tool_results "
+        f"(no preceding assistant message with tool_calls). "
+        f"Tool IDs: {[tr.get('tool_use_id', 'unknown') for tr in msg.tool_results]}"
+    )
+    
+    # Create a copy of the message without tool_results
+    return UnifiedMessage(
+        role=msg.role,
+        content=msg.content,
+        tool_calls=msg.tool_calls,
+        tool_results=None  # Strip orphaned tool_results
+    )
 
 
 def ensure_assistant_before_tool_results(messages: List[UnifiedMessage]) -> Tuple[List[UnifiedMessage], bool]:
@@ -874,134 +1178,225 @@ def ensure_assistant_before_tool_results(messages: List[UnifiedMessage]) -> Tupl
     if not messages:
         return [], False
     
-    result = []
+    result: List[UnifiedMessage] = []
     stripped_any_tool_results = False
     
     for msg in messages:
-        # Check if this message has tool_results
-        if msg.tool_results:
-            # Check if the previous message is an assistant with tool_calls
-            has_preceding_assistant = (
-                result and
-                result[-1].role == "assistant" and
-                result[-1].tool_calls
-            )
-            
-            if not has_preceding_assistant:
-                # We cannot create a valid synthetic assistant message because we don't know
-                # the original tool name and arguments. Kiro API validates tool names.
-                # Strip the tool_results to avoid "Improperly formed request" error.
-                logger.warning(
-                    f"Stripping {len(msg.tool_results)} orphaned tool_results "
-                    f"(no preceding assistant message with tool_calls). "
-                    f"Tool IDs: {[tr.get('tool_use_id', 'unknown') for tr in msg.tool_results]}"
-                )
-                
-                # Create a copy of the message without tool_results
-                cleaned_msg = UnifiedMessage(
-                    role=msg.role,
-                    content=msg.content,
-                    tool_calls=msg.tool_calls,
-                    tool_results=None  # Strip orphaned tool_results
-                )
-                result.append(cleaned_msg)
-                stripped_any_tool_results = True
-                continue
-        
-        result.append(msg)
+        cleaned_msg = _strip_orphaned_tool_results(msg, result[-1] if result else None)
+        if cleaned_msg is not None:
+            result.append(cleaned_msg)
+            stripped_any_tool_results = True
+        else:
+            result.append(msg)
     
     return result, stripped_any_tool_results
 
 
-def merge_adjacent_messages(messages: List[UnifiedMessage]) -> List[UnifiedMessage]:
+class _MessageMerger:
     """
-    Merges adjacent messages with the same role.
+    Accumulates messages, merging adjacent messages with the same role.
     
-    Kiro API does not accept multiple consecutive messages from the same role.
-    This function merges such messages into one.
-    
-    Args:
-        messages: List of messages in unified format
+    Shared by merge_adjacent_messages and build_kiro_payload, so that
+    payload building can clean up tool content and merge in one pass.
     
-    Returns:
-        List of messages with merged adjacent messages
+    Call finish() after the last message to get the merged list.
     """
-    if not messages:
-        return []
     
-    merged = []
-    # Statistics for summary logging
-    merge_counts = {"user": 0, "assistant": 0}
-    total_tool_calls_merged = 0
-    total_tool_results_merged = 0
-    
-    for msg in messages:
-        if not merged:
+    def __init__(self) -> None:
+        self._merged: List[UnifiedMessage] = []
+        # Message whose lists have already been copied by the merger, so they
+        # can be extended in place without touching lists owned by the caller
+        self._owned_last: Optional[UnifiedMessage] = None
+        # Text of merged plain-text contents of the last message, joined once
+        # on flush instead of re-concatenating the whole string on every merge
+        self._text_parts: Optional[List[str]] = None
+        # Statistics for summary logging
+        self._merge_counts = {"user": 0, "assistant": 0}
+        self._total_tool_calls_merged = 0
+        self._total_tool_results_merged = 0
+    
+    def add(self, msg: UnifiedMessage) -> None:
+        """
+        Adds a message, merging it into the last one if roles match.
+        
+        Args:
+            msg: Message in unified format
+        """
+        merged = self._merged
+        if not merged or merged[-1].role != msg.role:
+            self._flush_text()
             merged.append(msg)
-            continue
+            return
         
         last = merged[-1]
-        if msg.role == last.role:
-            # Merge content
+        
+        # Copy lists once per merge chain, then extend in place (avoids O(n^2) concatenation)
+        if self._owned_last is not last:
+            if isinstance(last.content, list):
+                last.content = list(last.content)
+            if last.tool_calls is not None:
+                last.tool_calls = list(last.tool_calls)
+            if last.tool_results is not None:
+                last.tool_results = list(last.tool_results)
+            self._owned_last = last
+        
+        # Merge content
+        if not isinstance(last.content, list) and not isinstance(msg.content, list):
+            if self._text_parts is None:
+                self._text_parts = [extract_text_content(last.content)]
+            self._text_parts.append(extract_text_content(msg.content))
+        else:
+            self._flush_text()
             if isinstance(last.content, list) and isinstance(msg.content, list):
-                last.content = last.content + msg.content
+                last.content.extend(msg.content)
             elif isinstance(last.content, list):
-                last.content = last.content + [{"type": "text", "text": extract_text_content(msg.content)}]
-            elif isinstance(msg.content, list):
-                last.content = [{"type": "text", "text": extract_text_content(last.content)}] + msg.content
+                last.content.append({"type": "text", "text": extract_text_content(msg.content)})
             else:
-                last_text = extract_text_content(last.content)
-                current_text = extract_text_content(msg.content)
-                last.content = f"{last_text}\n{current_text}"
-            
-            # Merge tool_calls for assistant messages
-            if msg.role == "assistant" and msg.tool_calls:
-                if last.tool_calls is None:
-                    last.tool_calls = []
-                last.tool_calls = list(last.tool_calls) + list(msg.tool_calls)
-                total_tool_calls_merged += len(msg.tool_calls)
-            
-            # Merge tool_results for user messages
-            if msg.role == "user" and msg.tool_results:
-                if last.tool_results is None:
-                    last.tool_results = []
-                last.tool_results = list(last.tool_results) + list(msg.tool_results)
-                total_tool_results_merged += len(msg.tool_results)
-            
-            # Count merges by role
-            if msg.role in merge_counts:
-                merge_counts[msg.role] += 1
-        else:
-            merged.append(msg)
-    
-    # Log summary if any merges occurred
-    total_merges = sum(merge_counts.values())
-    if total_merges > 0:
+                last.content = [{"type": "text", "text": extract_text_content(last.content)}] + msg.content
+        
+        # Merge tool_calls for assistant messages
+        if msg.role == "assistant" and msg.tool_calls:
+            if last.tool_calls is None:
+                last.tool_calls = []
+            last.tool_calls.extend(msg.tool_calls)
+            self._total_tool_calls_merged += len(msg.tool_calls)
+        
+        # Merge tool_results for user messages
+        if msg.role == "user" and msg.tool_results:
+            if last.tool_results is None:
+                last.tool_results = []
+            last.tool_results.extend(msg.tool_results)
+            self._total_tool_results_merged += len(msg.tool_results)
+        
+        # Count merges by role
+        if msg.role in self._merge_counts:
+            self._merge_counts[msg.role] += 1
+    
+    def _flush_text(self) -> None:
+        """Writes pending merged text into the last message (one assignment per merge chain)."""
+        if self._text_parts is not None:
+            self._merged[-1].content = "\n".join(self._text_parts)
+            self._text_parts = None
+    
+    def finish(self) -> List[UnifiedMessage]:
+        """
+        Completes merging and logs summary if any merges occurred.
+        
+        Returns:
+            List of merged messages
+        """
+        self._flush_text()
+        self._log_summary()
+        return self._merged
+    
+    def _log_summary(self) -> None:
+        """Logs summary if any merges occurred."""
+        total_merges = sum(self._merge_counts.values())
+        if total_merges == 0:
+            return
+        
         parts = []
-        for role, count in merge_counts.items():
+        for role, count in self._merge_counts.items():
             if count > 0:
                 parts.append(f"{count} {role}")
         merge_summary = ", ".join(parts)
         
         extras = []
-        if total_tool_calls_merged > 0:
-            extras.append(f"{total_tool_calls_merged} tool_calls")
-        if total_tool_results_merged > 0:
-            extras.append(f"{total_tool_results_merged} tool_results")
+        if self._total_tool_calls_merged > 0:
+            extras.append(f"{self._total_tool_calls_merged} tool_calls")
+        if self._total_tool_results_merged > 0:
+            extras.append(f"{self._total_tool_results_merged} tool_results")
         
         if extras:
             logger.debug(f"Merged {total_merges} adjacent messages ({merge_summary}), including {', '.join(extras)}")
         else:
             logger.debug(f"Merged {total_merges} adjacent messages ({merge_summary})")
+
+
+def merge_adjacent_messages(messages: List[UnifiedMessage]) -> List[UnifiedMessage]:
+    """
+    Merges adjacent messages with the same role.
+    
+    Kiro API does not accept multiple consecutive messages from the same role.
+    This function merges such messages into one.
+    
+    Args:
+        messages: List of messages in unified format
+    
+    Returns:
+        List of messages with merged adjacent messages
+    """
+    if not messages:
+        return []
+    
+    merger = _MessageMerger()
+    for msg in messages:
+        merger.add(msg)
     
-    return merged
+    return merger.finish()
+
+
+def prepare_messages_for_kiro(
+    messages: List[UnifiedMessage],
+    has_tools: bool
+) -> Tuple[List[UnifiedMessage], bool]:
+    """
+    Cleans up tool content and merges adjacent messages in a single pass.
+    
+    Equivalent to strip_all_tool_content (when no tools are defined) or
+    ensure_assistant_before_tool_results (when tools are defined),
+    followed by merge_adjacent_messages.
+    
+    Args:
+        messages: List of messages in unified format
+        has_tools: Whether the request defines any tools
+    
+    Returns:
+        Tuple of:
+        - List of cleaned and merged messages
+        - Boolean indicating whether any tool content was stripped or converted to text
+    """
+    merger = _MessageMerger()
+    previous: Optional[UnifiedMessage] = None
+    stripped_tool_content = False
+    total_tool_calls_stripped = 0
+    total_tool_results_stripped = 0
+    
+    for msg in messages:
+        if not has_tools:
+            # Kiro API rejects requests with toolResults but no tools
+            if msg.tool_calls:
+                total_tool_calls_stripped += len(msg.tool_calls)
+            if msg.tool_results:
+                total_tool_results_stripped += len(msg.tool_results)
+            msg = _tool_content_to_text(msg)
+        else:
+            # Ensure assistant messages exist before tool_results (Kiro API requirement).
+            # Checked against the previous message before merging.
+            cleaned_msg = _strip_orphaned_tool_results(msg, previous)
+            if cleaned_msg is not None:
+                msg = cleaned_msg
+                stripped_tool_content = True
+        
+        previous = msg
+        merger.add(msg)
+    
+    if not has_tools:
+        _log_stripped_tool_content(total_tool_calls_stripped, total_tool_results_stripped)
+        stripped_tool_content = total_tool_calls_stripped > 0 or total_tool_results_stripped > 0
+    
+    return merger.finish(), stripped_tool_content
 
 
 # ==================================================================================================
 # Kiro History Building
 # ==================================================================================================
 
-def build_kiro_history(messages: List[UnifiedMessage], model_id: str) -> List[Dict[str, Any]]:
+def build_kiro_history(
+    messages: List[UnifiedMessage],
+    model_id: str,
+    stop: Optional[int] = None
+) -> List[Dict[str, Any]]:
     """
     Builds history array for Kiro API from unified messages.
     
@@ -1011,13 +1406,17 @@ def build_kiro_history(messages: List[UnifiedMessage], model_id: str) -> List[Di
     Args:
         messages: List of messages in unified format
         model_id: Internal Kiro model ID
+        stop: Index to stop before (None for all messages), so callers
+              don't need to copy the list to exclude trailing messages
     
     Returns:
         List of dictionaries for history field in Kiro API
     """
-    history = []
+    history: List[Dict[str, Any]] = []
+    # Bound once - this loop runs for every message of long agent conversations
+    append_to_history = history.append
     
-    for msg in messages:
+    for msg in islice(messages, stop):
         if msg.role == "user":
             content = extract_text_content(msg.content)
             
@@ -1025,10 +1424,10 @@ def build_kiro_history(messages: List[UnifiedMessage], model_id: str) -> List[Di
             if not content:
                 content = "(empty)"
             
-            user_input = {
+            user_input: Dict[str, Any] = {
                 "content": content,
                 "modelId": model_id,
-                "origin": "AI_EDITOR",
+                "origin": _KIRO_ORIGIN,
             }
             
             # Process images - extract from message or content
@@ -1058,7 +1457,7 @@ def build_kiro_history(messages: List[UnifiedMessage], model_id: str) -> List[Di
             if user_input_context:
                 user_input["userInputMessageContext"] = user_input_context
             
-            history.append({"userInputMessage": user_input})
+            append_to_history({"userInputMessage": user_input})
             
         elif msg.role == "assistant":
             content = extract_text_content(msg.content)
@@ -1067,14 +1466,14 @@ def build_kiro_history(messages: List[UnifiedMessage], model_id: str) -> List[Di
             if not content:
                 content = "(empty)"
             
-            assistant_response = {"content": content}
+            assistant_response: Dict[str, Any] = {"content": content}
             
             # Process tool_calls
             tool_uses = extract_tool_uses_from_message(msg.content, msg.tool_calls)
             if tool_uses:
                 assistant_response["toolUses"] = tool_uses
             
-            history.append({"assistantResponseMessage": assistant_response})
+            append_to_history({"assistantResponseMessage": assistant_response})
     
     return history
 
@@ -1126,34 +1525,28 @@ def build_kiro_payload(
     if thinking_system_addition:
         full_system_prompt = full_system_prompt + thinking_system_addition if full_system_prompt else thinking_system_addition.strip()
     
-    # If no tools are defined, strip ALL tool-related content from messages
-    # Kiro API rejects requests with toolResults but no tools
-    if not tools:
-        messages_without_tools, had_tool_content = strip_all_tool_content(messages)
-        messages_with_assistants = messages_without_tools
-        stripped_tool_results = had_tool_content
-    else:
-        # Ensure assistant messages exist before tool_results (Kiro API requirement)
-        # Also returns flag if any tool_results were stripped (to skip thinking tag injection)
-        messages_with_assistants, stripped_tool_results = ensure_assistant_before_tool_results(messages)
-    
-    # Merge adjacent messages with the same role
-    merged_messages = merge_adjacent_messages(messages_with_assistants)
+    # Clean up tool content and merge adjacent messages with the same role:
+    # - no tools defined: convert ALL tool content to text (Kiro API rejects toolResults without tools)
+    # - tools defined: strip orphaned tool_results (flag is used to skip thinking tag injection)
+    merged_messages, stripped_tool_results = prepare_messages_for_kiro(messages, has_tools=bool(tools))
     
     if not merged_messages:
         raise ValueError("No messages to send")
     
     # Build history (all messages except the last one)
-    history_messages = merged_messages[:-1] if len(merged_messages) > 1 else []
+    history_end = len(merged_messages) - 1
     
     # If there's a system prompt, add it to the first user message in history
-    if full_system_prompt and history_messages:
-        first_msg = history_messages[0]
+    if full_system_prompt and history_end > 0:
+        first_msg = merged_messages[0]
         if first_msg.role == "user":
-            original_content = extract_text_content(first_msg.content)
-            first_msg.content = f"{full_system_prompt}\n\n{original_content}"
+            if isinstance(first_msg.content, list):
+                # Keep content blocks (images, tool_results) - prepend system prompt as a text block
+                first_msg.content = [{"type": "text", "text": f"{full_system_prompt}\n\n"}, *first_msg.content]
+            else:
+                first_msg.content = f"{full_system_prompt}\n\n{extract_text_content(first_msg.content)}"
     
-    history = build_kiro_history(history_messages, model_id)
+    history = build_kiro_history(merged_messages, model_id, stop=history_end)
     
     # Current message (the last one)
     current_message = merged_messages[-1]
@@ -1212,10 +1605,10 @@ def build_kiro_payload(
         current_content = inject_thinking_tags(current_content)
     
     # Build userInputMessage
-    user_input_message = {
+    user_input_message: Dict[str, Any] = {
         "content": current_content,
         "modelId": model_id,
-        "origin": "AI_EDITOR",
+        "origin": _KIRO_ORIGIN,
     }
     
     # Add images directly to userInputMessage (NOT to userInputMessageContext)
@@ -1226,20 +1619,21 @@ def build_kiro_payload(
     if user_input_context:
         user_input_message["userInputMessageContext"] = user_input_context
     
-    # Assemble final payload
-    payload = {
-        "conversationState": {
-            "chatTriggerType": "MANUAL",
-            "conversationId": conversation_id,
-            "currentMessage": {
-                "userInputMessage": user_input_message
-            }
+    # Assemble conversation state
+    conversation_state: Dict[str, Any] = {
+        "chatTriggerType": _KIRO_CHAT_TRIGGER_TYPE,
+        "conversationId": conversation_id,
+        "currentMessage": {
+            "userInputMessage": user_input_message
         }
     }
     
     # Add history only if not empty
     if history:
-        payload["conversationState"]["history"] = history
+        conversation_state["history"] = history
+    
+    # Assemble final payload
+    payload: Dict[str, Any] = {"conversationState": conversation_state}
     
     # Add profileArn
     if profile_arn:
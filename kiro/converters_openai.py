@@ -41,6 +41,7 @@ from kiro.models_openai import ChatMessage, ChatCompletionRequest, Tool
 from kiro.converters_core import (
     extract_text_content,
     extract_images_from_content,
+    strip_text,
     UnifiedMessage,
     UnifiedTool,
     build_kiro_payload as core_build_kiro_payload,
@@ -61,18 +62,18 @@ def _extract_tool_results_from_openai(content: Any) -> List[Dict[str, Any]]:
     Returns:
         List of tool results in unified format for UnifiedMessage
     """
-    tool_results = []
+    if not isinstance(content, list):
+        return []
     
-    if isinstance(content, list):
-        for item in content:
-            if isinstance(item, dict) and item.get("type") == "tool_result":
-                tool_results.append({
-                    "type": "tool_result",
-                    "tool_use_id": item.get("tool_use_id", ""),
-                    "content": extract_text_content(item.get("content", "")) or "(empty result)"
-                })
-    
-    return tool_results
+    return [
+        {
+            "type": "tool_result",
+            "tool_use_id": item.get("tool_use_id", ""),
+            "content": extract_text_content(item.get("content", "")) or "(empty result)"
+        }
+        for item in content
+        if isinstance(item, dict) and item.get("type") == "tool_result"
+    ]
 
 
 def _extract_tool_calls_from_openai(msg: ChatMessage) -> List[Dict[str, Any]]:
@@ -90,12 +91,13 @@ def _extract_tool_calls_from_openai(msg: ChatMessage) -> List[Dict[str, Any]]:
     if msg.tool_calls:
         for tc in msg.tool_calls:
             if isinstance(tc, dict):
+                func = tc.get("function") or {}
                 tool_calls.append({
                     "id": tc.get("id", ""),
                     "type": "function",
                     "function": {
-                        "name": tc.get("function", {}).get("name", ""),
-                        "arguments": tc.get("function", {}).get("arguments", "{}")
+                        "name": func.get("name", ""),
+                        "arguments": func.get("arguments", "{}")
                     }
                 })
     
@@ -117,27 +119,20 @@ def convert_openai_messages_to_unified(messages: List[ChatMessage]) -> Tuple[str
     Returns:
         Tuple of (system_prompt, unified_messages)
     """
-    # Extract system prompt
-    system_prompt = ""
-    non_system_messages = []
-    
-    for msg in messages:
-        if msg.role == "system":
-            system_prompt += extract_text_content(msg.content) + "\n"
-        else:
-            non_system_messages.append(msg)
-    
-    system_prompt = system_prompt.strip()
-    
-    # Process tool messages - convert to user messages with tool_results
+    # Single pass: extract system prompt and convert tool messages
+    # to user messages with tool_results
+    system_parts = []
     processed = []
     pending_tool_results = []
     total_tool_calls = 0
     total_tool_results = 0
     total_images = 0
 
-    for msg in non_system_messages:
-        if msg.role == "tool":
+    for msg in messages:
+        if msg.role == "system":
+            # System messages do not interrupt tool result grouping
+            system_parts.append(extract_text_content(msg.content))
+        elif msg.role == "tool":
             # Collect tool results
             tool_result = {
                 "type": "tool_result",
@@ -152,10 +147,10 @@ def convert_openai_messages_to_unified(messages: List[ChatMessage]) -> Tuple[str
                 unified_msg = UnifiedMessage(
                     role="user",
                     content="",
-                    tool_results=pending_tool_results.copy()
+                    tool_results=pending_tool_results
                 )
                 processed.append(unified_msg)
-                pending_tool_results.clear()
+                pending_tool_results = []
             
             # Convert regular message
             tool_calls = None
@@ -189,10 +184,12 @@ def convert_openai_messages_to_unified(messages: List[ChatMessage]) -> Tuple[str
         unified_msg = UnifiedMessage(
             role="user",
             content="",
-            tool_results=pending_tool_results.copy()
+            tool_results=pending_tool_results
         )
         processed.append(unified_msg)
     
+    system_prompt = strip_text("\n".join(system_parts))
+    
     # Log summary if any tool content or images were found
     if total_tool_calls > 0 or total_tool_results > 0 or total_images > 0:
         logger.debug(
@@ -32,6 +32,7 @@ empirical observations: Claude tokenizes text approximately 15%
 more than GPT-4 (cl100k_base). This is due to differences in BPE vocabularies.
 """
 
+import json
 from typing import List, Dict, Any, Optional
 from loguru import logger
 
@@ -203,7 +204,6 @@ def count_tools_tokens(tools: Optional[List[Dict[str, Any]]], apply_claude_corre
             # Parameters (JSON schema)
             params = func.get("parameters")
             if params:
-                import json
                 params_str = json.dumps(params, ensure_ascii=False)
                 total_tokens += count_tokens(params_str, apply_claude_correction=False)
     
@@ -67,6 +67,25 @@ class TestConvertOpenAIMessagesToUnified:
         assert "Be concise." in system_prompt
         assert len(unified) == 1
     
+    def test_joins_system_messages_with_newline(self):
+        """
+        What it does: Verifies the exact separator between system messages.
+        Purpose: Ensure system messages are joined with a single newline and trimmed.
+        """
+        print("Setup: Several system messages, some with surrounding whitespace...")
+        messages = [
+            ChatMessage(role="system", content="  First."),
+            ChatMessage(role="system", content="Second."),
+            ChatMessage(role="system", content="Third.\n"),
+            ChatMessage(role="user", content="Hello")
+        ]
+        
+        print("Action: Converting messages...")
+        system_prompt, unified = convert_openai_messages_to_unified(messages)
+        
+        print(f"Comparing system prompt: Expected 'First.\\nSecond.\\nThird.', Got {system_prompt!r}")
+        assert system_prompt == "First.\nSecond.\nThird."
+    
     def test_converts_tool_message_to_user_with_tool_results(self):
         """
         What it does: Verifies conversion of tool message to user message with tool_results.
@@ -107,6 +126,29 @@ class TestConvertOpenAIMessagesToUnified:
         assert unified[0].role == "user"
         assert len(unified[0].tool_results) == 3
     
+    def test_system_message_does_not_split_tool_results(self):
+        """
+        What it does: Verifies that a system message between tool messages doesn't split them.
+        Purpose: Ensure tool results are grouped the same way as when system messages are removed first.
+        """
+        print("Setup: Tool messages interleaved with a system message...")
+        messages = [
+            ChatMessage(role="tool", content="Result 1", tool_call_id="call_1"),
+            ChatMessage(role="system", content="Be concise."),
+            ChatMessage(role="tool", content="Result 2", tool_call_id="call_2"),
+            ChatMessage(role="user", content="Thanks")
+        ]
+        
+        print("Action: Converting messages...")
+        system_prompt, unified = convert_openai_messages_to_unified(messages)
+        
+        print(f"Unified messages: {unified}")
+        assert system_prompt == "Be concise."
+        assert len(unified) == 2
+        assert unified[0].role == "user"
+        assert [tr["tool_use_id"] for tr in unified[0].tool_results] == ["call_1", "call_2"]
+        assert unified[1].content == "Thanks"
+    
     def test_extracts_tool_calls_from_assistant(self):
         """
         What it does: Verifies extraction of tool_calls from assistant message.
@@ -135,6 +177,28 @@ class TestConvertOpenAIMessagesToUnified:
         assert len(unified[0].tool_calls) == 1
         assert unified[0].tool_calls[0]["id"] == "call_123"
     
+    def test_handles_tool_call_without_function(self):
+        """
+        What it does: Verifies handling of tool_call with null function.
+        Purpose: Ensure a malformed tool_call gets empty name and default arguments instead of crashing.
+        """
+        print("Setup: Assistant message with tool_call without function...")
+        messages = [
+            ChatMessage(
+                role="assistant",
+                content="",
+                tool_calls=[{"id": "call_456", "type": "function", "function": None}]
+            )
+        ]
+        
+        print("Action: Converting messages...")
+        system_prompt, unified = convert_openai_messages_to_unified(messages)
+        
+        print(f"Unified messages: {unified}")
+        tool_call = unified[0].tool_calls[0]
+        assert tool_call["id"] == "call_456"
+        assert tool_call["function"] == {"name": "", "arguments": "{}"}
+    
     def test_handles_empty_tool_call_id(self):
         """
         What it does: Verifies handling of None tool_call_id.